@@ -6,28 +6,90 @@
 
 from typing import Self, Type
 import sys
-from os import environ
+from os import environ, cpu_count
+from time import perf_counter
+from functools import lru_cache
+from itertools import product
 
-from ortools.sat.python.cp_model import IntVar, Domain, CpModel, CpSolver, OPTIMAL, FEASIBLE
+from ortools.sat.python import cp_model
+from ortools.sat.python.cp_model import (IntVar, Domain, CpModel, CpSolver,
+                                         CpSolverSolutionCallback, OPTIMAL, FEASIBLE,
+                                         INFEASIBLE)
 
-DEBUG = int(environ.get('MAGCUBE_DEBUG') or 0)
-
-# 2D types
-Coord2dT = tuple[int, int]            # (x, y) coordinates
-SquareT  = tuple[Coord2dT, Coord2dT]  # (position, polarity)
-ShapeT   = tuple[SquareT, SquareT, SquareT]
+from pieces import (Coord2dT, PieceT, COORDS, ROTATIONS, pack_coord, rotate_piece,
+                    build_pieces)
 
-# 3D types
-CoordT   = tuple[int, int, int]       # (x, y, z) coordinates
-BlockT   = tuple[CoordT, CoordT]      # (position, polarity)
-PieceT   = tuple[BlockT, BlockT, BlockT]
-PosKeyT  = tuple[CoordT, int]         # int represents piece ID
+DEBUG = int(environ.get('MAGCUBE_DEBUG') or 0)
+WORKERS = int(environ.get('MAGCUBE_WORKERS') or 0) or cpu_count() or 1
+# max number of built models (i.e. distinct sets of pieces) to keep cached
+MODEL_CACHE = 8
+
+def parse_strategy(spec: str) -> tuple[int, int] | None:
+    """Parse decision strategy specification, of the form
+    ``'<var_strategy>,<domain_strategy>'`` (names of ``CHOOSE_*`` and ``SELECT_*``
+    constants from `cp_model`, respectively).  Return ``None`` if the specification is
+    empty; raise ``ValueError`` if it is invalid.
+    """
+    if not spec.strip():
+        return None
+    names = [name.strip() for name in spec.split(',')]
+    if (len(names) != 2 or not names[0].startswith('CHOOSE_')
+        or not names[1].startswith('SELECT_')
+        or not all(hasattr(cp_model, name) for name in names)):
+        raise ValueError(f"Invalid decision strategy '{spec}' (expecting "
+                         "'<CHOOSE_*>,<SELECT_*>', e.g. 'CHOOSE_FIRST,SELECT_MAX_VALUE')")
+    var_strat, dom_strat = (getattr(cp_model, name) for name in names)
+    return var_strat, dom_strat
+
+# decision strategy for piece selection, specified as '<var_strategy>,<domain_strategy>'
+# (see `parse_strategy()`); by default (unset or empty), it is left up to the solver
+STRATEGY = parse_strategy(environ.get('MAGCUBE_STRATEGY') or '')
+
+# source for reading variable values in a solution
+ValueSrcT = CpSolver | CpSolverSolutionCallback
+
+# used as the base of a polarity vector (NOTE: list index is the packed 2D coordinate,
+# i.e. ``3 * c1 + c2``)
+GRID_COORDS = tuple(product(range(3), repeat=2))
+
+# packed coordinates for the corners of the cube (NOTE: (0, 0, 0) comes first)
+CORNERS = tuple(pack_coord(coord) for coord in COORDS if set(coord) <= {0, 2})
+
+@lru_cache(maxsize=MODEL_CACHE)
+def coord_piece_index(piece_blks: tuple[tuple[int, ...], ...]) -> tuple[tuple[int, ...], ...]:
+    """Return inverted index of piece IDs that can occupy each puzzle coordinate (indexed
+    by packed coordinate), given the packed block coordinates for each piece.  The index
+    is cached, so it is shared by all models built for the same set of pieces.
+    """
+    at_coord = [[] for _ in COORDS]
+    for p_id, blk_idxs in enumerate(piece_blks):
+        for idx in blk_idxs:
+            at_coord[idx].append(p_id)
+    return tuple(tuple(p_ids) for p_ids in at_coord)
+
+#####################
+# SolutionCollector #
+#####################
+
+class SolutionCollector(CpSolverSolutionCallback):
+    """Solution callback that records every solution found during the search (in the
+    form returned by the model's ``solution()`` method).
+    """
+    model:     'BaseModel'
+    solutions: list[list[int]]
 
-# all valid coordinates for the puzzle
-COORDS = [(x, y, z) for x in range(3) for y in range(3) for z in range(3)]
+    def __init__(self, model: 'BaseModel'):
+        """Constructor takes the model being solved as input.
+        """
+        super().__init__()
+        self.model     = model
+        self.solutions = []
 
-# used as the base of a polarity vector
-GRID_COORDS = [(c1, c2) for c1 in range(3) for c2 in range(3)]
+    def on_solution_callback(self) -> None:
+        """Read the solution from the current assignment (the callback itself serves as
+        the source of variable values).
+        """
+        self.solutions.append(self.model.solution(self))
 
 #############
 # BaseModel #
@@ -35,51 +97,54 @@ GRID_COORDS = [(c1, c2) for c1 in range(3) for c2 in range(3)]
 
 class BaseModel(CpModel):
     """Abstract base class for local models.  Subclasses must implement ``build()`` and
-    ``solution()`` methods (and optionally, ``__init__()``).
+    ``solution()`` methods (and optionally, ``__init__()``).  Variables and constraints are
+    added directly to the instance (which is itself the ``CpModel``).
     """
-    model:      CpModel
     solver:     CpSolver
+    status:     int | None                 # solver status (``None`` if not yet solved)
+    solutions:  list[list[int]]            # only populated if enumerating all solutions
     pieces:     list[PieceT]
-    at_coord:   dict[CoordT, list[int]]    # value: list of piece IDs
-    xy_pol_pos: dict[Coord2dT, list[int]]  # value: list of piece IDs
-    xy_pol_neg: dict[Coord2dT, list[int]]
-    xz_pol_pos: dict[Coord2dT, list[int]]
-    xz_pol_neg: dict[Coord2dT, list[int]]
-    yz_pol_pos: dict[Coord2dT, list[int]]
-    yz_pol_neg: dict[Coord2dT, list[int]]
+    piece_blks: tuple[tuple[int, ...], ...]  # indexed by piece ID; value: packed coords
+    at_coord:   tuple[tuple[int, ...], ...]  # indexed by packed coord; value: piece IDs
+    pol_groups: list[list[list[list[int]]]]  # [plane][polarity][grid idx]; value: piece IDs
+    xy_pol_pos: list[list[int]]            # views into `pol_groups`, indexed by grid idx
+    xy_pol_neg: list[list[int]]
+    xz_pol_pos: list[list[int]]
+    xz_pol_neg: list[list[int]]
+    yz_pol_pos: list[list[int]]
+    yz_pol_neg: list[list[int]]
 
     def __init__(self, pieces: list[PieceT]):
         """Constructor takes list of pieces as input.
         """
         super().__init__()
-        self.model      = CpModel()
-        self.solver     = None
+        self.solver     = CpSolver()
+        self.status     = None
+        self.solutions  = None
         self.pieces     = pieces
-        self.at_coord   = {coord: [] for coord in COORDS}
-        self.xy_pol_pos = {coord2d: [] for coord2d in GRID_COORDS}
-        self.xy_pol_neg = {coord2d: [] for coord2d in GRID_COORDS}
-        self.xz_pol_pos = {coord2d: [] for coord2d in GRID_COORDS}
-        self.xz_pol_neg = {coord2d: [] for coord2d in GRID_COORDS}
-        self.yz_pol_pos = {coord2d: [] for coord2d in GRID_COORDS}
-        self.yz_pol_neg = {coord2d: [] for coord2d in GRID_COORDS}
-
+        self.piece_blks = tuple(tuple(pack_coord(pos) for pos, _ in piece) for piece in pieces)
+        self.at_coord   = coord_piece_index(self.piece_blks)
+        self.pol_groups = [[[[] for _ in GRID_COORDS] for _ in range(2)] for _ in range(3)]
+        self.xy_pol_neg, self.xy_pol_pos = self.pol_groups[0]
+        self.xz_pol_neg, self.xz_pol_pos = self.pol_groups[1]
+        self.yz_pol_neg, self.yz_pol_pos = self.pol_groups[2]
+
+        # record the list of pieces with positive and negative polarities along each
+        # polarity vector (grid idx for each plane is the packed 2D coordinate)
+        xy_groups, xz_groups, yz_groups = self.pol_groups
         for p_id, piece in enumerate(self.pieces):
             for (px, py, pz), (mx, my, mz) in piece:
-                self.at_coord[(px, py, pz)].append(p_id)
-                # record the list of pieces with positive and negative polarities along
-                # each polarity vector
-                if mz:
-                    self.xy_pol_pos[(px, py)].append(p_id)
-                else:
-                    self.xy_pol_neg[(px, py)].append(p_id)
-                if my:
-                    self.xz_pol_pos[(px, pz)].append(p_id)
-                else:
-                    self.xz_pol_neg[(px, pz)].append(p_id)
-                if mx:
-                    self.yz_pol_pos[(py, pz)].append(p_id)
-                else:
-                    self.yz_pol_neg[(py, pz)].append(p_id)
+                xy_groups[mz][3 * px + py].append(p_id)
+                xz_groups[my][3 * px + pz].append(p_id)
+                yz_groups[mx][3 * py + pz].append(p_id)
+
+        # static solver parameters are set once here; the model is purely boolean, so the
+        # linear relaxation is of no use
+        self.solver.parameters.linearization_level = 0
+        if DEBUG:
+            self.solver.parameters.log_search_progress = True
+            if DEBUG > 1:
+                self.solver.parameters.log_subsolver_statistics = True
 
     @property
     def npieces(self) -> int:
@@ -93,30 +158,38 @@ class BaseModel(CpModel):
         """
         raise NotImplementedError("Can't call abstract method")
 
-    def solve(self) -> bool:
-        """Return ``True`` if solution is found; ``False`` otherwise.
+    def solve(self, all_solutions: bool = False) -> bool:
+        """Return ``True`` if solution is found; ``False`` otherwise.  If ``all_solutions``
+        is specified, the search enumerates all solutions (streamed to ``self.solutions``
+        from within the search, rather than re-solving for each one).
         """
-        self.solver = CpSolver()
-        if DEBUG:
-            self.solver.parameters.log_search_progress = True
-            if DEBUG > 1:
-                self.solver.parameters.log_subsolver_statistics = True
-        status = self.solver.solve(self.model)
-        print(f"Status: {status} ({self.solver.status_name()})", file=sys.stderr)
-        if info := self.solver.solution_info():
+        # enumeration is only supported for single-worker search; otherwise, use the
+        # parallel portfolio search
+        self.solver.parameters.enumerate_all_solutions = all_solutions
+        self.solver.parameters.num_workers = 1 if all_solutions else WORKERS
+        if all_solutions:
+            collector = SolutionCollector(self)
+            self.status = self.solver.solve(self, collector)
+            self.solutions = collector.solutions
+        else:
+            self.status = self.solver.solve(self)
+            self.solutions = None  # not left over from a previous (cached model) solve
+        print(f"Status: {self.status} ({self.solver.status_name()})", file=sys.stderr)
+        if DEBUG and (info := self.solver.solution_info()):
             print(f"Solution info: {info}", file=sys.stderr)
-        return status in (OPTIMAL, FEASIBLE)
+        return self.status in (OPTIMAL, FEASIBLE)
 
-    def solution(self) -> list[int]:
-        """Return list of pieces for the solution.  Abstract method--must be implemented
-        by the subclass.
+    def solution(self, values: ValueSrcT = None) -> list[int]:
+        """Return list of pieces for the solution.  Variable values are read from
+        ``values`` if specified (e.g. from within a solution callback), otherwise from the
+        solver.  Abstract method--must be implemented by the subclass.
         """
         raise NotImplementedError("Can't call abstract method")
 
     def print_stats(self) -> None:
         """Print solver stats, for benchmarking and/or analysis.
         """
-        if not self.solver:
+        if self.status is None:
             raise RuntimeError("Must solve before stats are available")
 
         print("\nSolver Stats", file=sys.stderr)
@@ -132,46 +205,43 @@ class Model0(BaseModel):
     """Simplified (incomplete) model containing only positional constraints.  This is used
     as the basis for various approaches to modeling the magnetics constraints.
     """
-    piece_pos:   dict[PosKeyT, IntVar]
     piece_used:  list[IntVar]  # indexed by piece ID
 
     def __init__(self, pieces: list[PieceT]):
         """Constructor takes list of pieces as input.
         """
         super().__init__(pieces)
-        self.piece_pos   = None
         self.piece_used  = None
 
     def build(self) -> Self:
         """Add variables and constraints for the model.  Return ``self``, for method
         chaining.
         """
-        # Constraint #0 - specify domain for (coord, p_id)
-        self.piece_pos = {}
-        for coord in COORDS:
-            for p_id in range(self.npieces):
-                self.piece_pos[coord, p_id] = self.model.new_bool_var(f'pos_{coord}_{p_id}')
-
-        # Constraint #1 - specify boolean variables for piece usage, and associated
-        # all-or-none constraints (reified) for each piece's component blocks
-        self.piece_used = [self.model.new_bool_var(f'used_{p_id}') for p_id in range(self.npieces)]
-        for p_id, piece in enumerate(self.pieces):
-            all_blocks = [self.piece_pos[blk_pos, p_id] for blk_pos, _ in piece]
-            no_blocks = [~self.piece_pos[blk_pos, p_id] for blk_pos, _ in piece]
-            self.model.add_bool_and(all_blocks).only_enforce_if(self.piece_used[p_id])
-            self.model.add_bool_and(no_blocks).only_enforce_if(~self.piece_used[p_id])
+        # Constraint #1 - specify boolean variables for piece usage (all blocks of a piece
+        # are placed or not placed together, so no per-block variables are needed)
+        self.piece_used = [self.new_bool_var(f'used_{p_id}') for p_id in range(self.npieces)]
 
-        # Constraint #2 - ensure valid piece-block mapping for all puzzle coordinates
-        for coord in COORDS:
-            coord_pieces = (self.piece_pos[coord, p_id] for p_id in self.at_coord[coord])
-            self.model.add(sum(coord_pieces) == 1)
+        # branch on piece selection (see `STRATEGY`)
+        if STRATEGY:
+            self.add_decision_strategy(self.piece_used, *STRATEGY)
+
+        # Constraint #2 - ensure exactly one piece covers each of the puzzle coordinates
+        # (i.e. exact cover)
+        for coord_pieces in self.at_coord:
+            self.add_exactly_one(self.piece_used[p_id] for p_id in coord_pieces)
+
+        # redundant cardinality constraint (implied by #2, since every piece has three
+        # blocks), which strengthens propagation
+        self.add(sum(self.piece_used) == len(COORDS) // 3)
 
         return self
 
-    def solution(self) -> list[int]:
+    def solution(self, values: ValueSrcT = None) -> list[int]:
         """Return list of pieces for the solution.
         """
-        return [p_id for p_id in range(self.npieces) if self.solver.value(self.piece_used[p_id])]
+        if values is None:
+            values = self.solver
+        return [p_id for p_id, used in enumerate(self.piece_used) if values.boolean_value(used)]
 
 ##########
 # ModelA #
@@ -200,139 +270,212 @@ class ModelA(Model0):
         super().build()
 
         # Constraint #3 - specify variables for all polarity vectors, and ensure that all
-        # pieces are aligned on vectors
-        self.xy_polarity = {coord2d: self.model.new_bool_var(f'xy_pol_{coord2d}')
-                            for coord2d in GRID_COORDS}
-        self.xz_polarity = {coord2d: self.model.new_bool_var(f'xz_pol_{coord2d}')
-                            for coord2d in GRID_COORDS}
-        self.yz_polarity = {coord2d: self.model.new_bool_var(f'yz_pol_{coord2d}')
-                            for coord2d in GRID_COORDS}
-
-        for coord2d in GRID_COORDS:
-            xy_pos_pieces = [self.piece_used[p_id] for p_id in self.xy_pol_pos[coord2d]]
-            xy_neg_pieces = [self.piece_used[p_id] for p_id in self.xy_pol_neg[coord2d]]
-            self.model.add(sum(xy_pos_pieces) == 3).only_enforce_if(self.xy_polarity[coord2d])
-            self.model.add(sum(xy_neg_pieces) == 3).only_enforce_if(~self.xy_polarity[coord2d])
-
-            xz_pos_pieces = [self.piece_used[p_id] for p_id in self.xz_pol_pos[coord2d]]
-            xz_neg_pieces = [self.piece_used[p_id] for p_id in self.xz_pol_neg[coord2d]]
-            self.model.add(sum(xz_pos_pieces) == 3).only_enforce_if(self.xz_polarity[coord2d])
-            self.model.add(sum(xz_neg_pieces) == 3).only_enforce_if(~self.xz_polarity[coord2d])
-
-            yz_pos_pieces = [self.piece_used[p_id] for p_id in self.yz_pol_pos[coord2d]]
-            yz_neg_pieces = [self.piece_used[p_id] for p_id in self.yz_pol_neg[coord2d]]
-            self.model.add(sum(yz_pos_pieces) == 3).only_enforce_if(self.yz_polarity[coord2d])
-            self.model.add(sum(yz_neg_pieces) == 3).only_enforce_if(~self.yz_polarity[coord2d])
-
-        #self.model.add_assumption(self.piece_used[0])
+        # pieces are aligned on vectors; each piece with a block along a vector implies the
+        # polarity of the vector (as a binary clause), so all pieces placed along it must
+        # agree
+        self.xy_polarity = self._add_polarity_constraints('xy', self.xy_pol_pos, self.xy_pol_neg)
+        self.xz_polarity = self._add_polarity_constraints('xz', self.xz_pol_pos, self.xz_pol_neg)
+        self.yz_polarity = self._add_polarity_constraints('yz', self.yz_pol_pos, self.yz_pol_neg)
+
+        # Constraint #4 - break the rotational symmetry of the cube (see
+        # `_break_symmetry()`); this is only valid if the set of pieces is closed under
+        # rotation, so skip otherwise
+        piece_ids = {frozenset(piece): p_id for p_id, piece in enumerate(self.pieces)}
+        rot_ids = [[piece_ids.get(frozenset(rotate_piece(piece, rot))) for piece in self.pieces]
+                   for rot in ROTATIONS]
+        if not any(None in ids for ids in rot_ids):
+            self._break_symmetry(rot_ids)
+
+        #self.add_assumption(self.piece_used[0])
         return self
 
-################
-# build_pieces #
-################
+    def _break_symmetry(self, rot_ids: list[list[int]]) -> None:
+        """Add symmetry-breaking constraints, given the piece ID mappings for each of the
+        rotations in ``ROTATIONS``.
 
-ROT_2D = {
-    (0, 0): (0, 1),
-    (0, 1): (1, 1),
-    (1, 1): (1, 0),
-    (1, 0): (0, 0)
-}
+        Any solution can be rotated such that the piece at the (0, 0, 0) corner belongs to
+        the lowest orbit (under rotation) among all of the corner pieces, and then further
+        rotated around the diagonal through that corner (which maps the set of corners
+        onto itself) such that the piece has the lowest ID within its orbit under those
+        rotations.  Only solutions in this canonical form are allowed.
+        """
+        orbit_min = [min(ids[p_id] for ids in rot_ids) for p_id in range(self.npieces)]
+        # rotations leaving (0, 0, 0) in place are those without any axis reversal
+        stab_ids = [ids for (_, flip), ids in zip(ROTATIONS, rot_ids) if not any(flip)]
+        stab_min = [min(ids[p_id] for ids in stab_ids) for p_id in range(self.npieces)]
+
+        origin, *corners = CORNERS
+        for p_id in self.at_coord[origin]:
+            if stab_min[p_id] < p_id:
+                self.add(self.piece_used[p_id] == 0)
+                continue
+            for corner in corners:
+                for q_id in self.at_coord[corner]:
+                    if orbit_min[q_id] < orbit_min[p_id]:
+                        self.add_implication(self.piece_used[p_id], ~self.piece_used[q_id])
+
+    def _add_polarity_constraints(self, plane: str, pol_pos: list[list[int]],
+                                  pol_neg: list[list[int]]) -> dict[Coord2dT, IntVar]:
+        """Add polarity variables and constraints (see Constraint #3) for the vectors
+        normal to the specified plane.  Return the variables, keyed by 2D coordinate.
+        """
+        polarity = {}
+        for grid_idx, coord2d in enumerate(GRID_COORDS):
+            pol_var = self.new_bool_var(f'{plane}_pol_{coord2d}')
+            # a piece may have two blocks along the same vector, so dedup (preserving order)
+            for p_id in dict.fromkeys(pol_pos[grid_idx]):
+                self.add_implication(self.piece_used[p_id], pol_var)
+            for p_id in dict.fromkeys(pol_neg[grid_idx]):
+                self.add_implication(self.piece_used[p_id], ~pol_var)
+            polarity[coord2d] = pol_var
+        return polarity
 
-REF_SHAPES = 4
+##########
+# ModelC #
+##########
 
-def rot_coord(coord2d: Coord2dT) -> Coord2dT:
-    """Rotate 2D coordinate (in 2x2 space) 90 degrees clockwise.  Works for either
-    position or polarity.
-    """
-    return ROT_2D[coord2d]
+class ModelC(BaseModel):
+    """Bitmask-based exact cover search (including magnetics constraints), in place of the
+    CP-SAT search.  Each piece is represented as a 27-bit mask of the coordinates it
+    occupies (bit index is the packed coordinate), plus masks of the polarity vectors that
+    it requires to be positive or negative (bit index is ``9 * plane + grid idx``).  The
+    search recursively places a piece covering the lowest unoccupied coordinate.
 
-def rot_shape(shape: ShapeT) -> ShapeT:
-    """Rotate shape 90 degrees clockwise, both positionally and magnetically.
+    The model is still a ``BaseModel`` (for the piece tables and the common interface), so
+    it carries the inherited ``CpModel`` and ``CpSolver``, but no variables or constraints
+    are added and the solver is not used.
     """
-    return tuple((rot_coord(pos), rot_coord(pol)) for pos, pol in shape)
+    blk_masks: list[int]        # indexed by piece ID
+    pos_masks: list[int]        # indexed by piece ID
+    neg_masks: list[int]        # indexed by piece ID
+    buckets:   list[list[int]]  # indexed by packed coord; value: piece IDs (lowest block)
+    found:     list[list[int]]
+    nodes:     int
+    wall_time: float
 
-def tr_pos(pos: Coord2dT, vec: Coord2dT) -> Coord2dT:
-    """Translate (move) position by specified 2D vector.
-    """
-    x, y = pos
-    dx, dy = vec
-    return x + dx, y + dy
+    def __init__(self, pieces: list[PieceT]):
+        """Constructor takes list of pieces as input.
+        """
+        super().__init__(pieces)
+        self.blk_masks = None
+        self.pos_masks = None
+        self.neg_masks = None
+        self.buckets   = None
+        self.found     = None
+        self.nodes     = 0
+        self.wall_time = 0.0
 
-def tr_shape(shape: ShapeT, vec: Coord2dT) -> ShapeT:
-    """Translate (move) shape by specified 2D vector.
-    """
-    pos_0, pol_0 = shape[0]
-    pos_1, pol_1 = shape[1]
-    pos_2, pol_2 = shape[2]
-    square_0 = tr_pos(pos_0, vec), pol_0
-    square_1 = tr_pos(pos_1, vec), pol_1
-    square_2 = tr_pos(pos_2, vec), pol_2
-    return square_0, square_1, square_2
-
-def build_pieces() -> list:
-    """Generate full list of distinct (positionally and magnetically) puzzle pieces.
-
-    Each piece is composed of three blocks, arranged in the shape of an L.  Each block is
-    described by its 3D position (within a 3x3x3 space) plus 3 dimensions of polarity
-    (assumed to be the same for all blocks within a piece--to be verified!).
-
-    For polarity, ``1`` indicates directionally positive polarity for an axis, ``0``
-    indicates directionally negative polarity.
-    """
-    xy_shapes = []  # list[ShapeT]
-    xy_pieces = []  # list[PieceT]
-    xz_pieces = []
-    yz_pieces = []
-
-    # base everything off of initial reference shape; NOTE that first square is the one in
-    # the middle (important later for setting the origin of the piece when rendering)
-    sq_0 = (0, 0), (1, 0)
-    sq_1 = (1, 0), (1, 0)
-    sq_2 = (0, 1), (1, 0)
-    sh_0 = (sq_0, sq_1, sq_2)
-    xy_shapes.append(sh_0)
-
-    # create rotations (and validate full cycling)
-    xy_shapes.append(rot_shape(xy_shapes[-1]))
-    xy_shapes.append(rot_shape(xy_shapes[-1]))
-    xy_shapes.append(rot_shape(xy_shapes[-1]))
-    assert len(xy_shapes) == REF_SHAPES
-    assert rot_shape(xy_shapes[-1]) == sh_0
-
-    # now create translations of the shapes to complete xy_shapes
-    for vec in (1, 0), (1, 1), (0, 1):
-        for shape in xy_shapes[:REF_SHAPES]:
-            xy_shapes.append(tr_shape(shape, vec))
-
-    # generate xy_pieces from xy_shapes
-    for z in range(3):
-        # xy_pieces with positive z-axis polarity
-        for shape in xy_shapes:
-            xy_pieces.append(tuple(((px, py, z), (mx, my, 1))
-                                   for (px, py), (mx, my) in shape))
-
-        # add flipped xy_pieces--flipping along center block diagonal (so "arm" blocks
-        # swap spots), which in actuality means just reversing all of the polarities
-        for shape in xy_shapes:
-            xy_pieces.append(tuple(((px, py, z), (mx ^ 0x01, my ^ 0x01, 0))
-                                   for (px, py), (mx, my) in reversed(shape)))
-
-    # generate xz_pieces from xy_pieces
-    for piece in xy_pieces:
-        xz_pieces.append(tuple(((px, pz, py), (mx, mz ^ 0x01, my))
-                               for (px, py, pz), (mx, my, mz) in piece))
-
-    # generate yz_pieces from xz_pieces
-    for piece in xz_pieces:
-        yz_pieces.append(tuple(((py, px, pz), (my ^ 0x01, mx, mz))
-                               for (px, py, pz), (mx, my, mz) in piece))
-
-    return xy_pieces + xz_pieces + yz_pieces
+    def build(self) -> Self:
+        """Compute piece and polarity masks, and bucket pieces by lowest occupied
+        coordinate.  Return ``self``, for method chaining.
+        """
+        self.blk_masks = [sum(1 << idx for idx in blk_idxs) for blk_idxs in self.piece_blks]
+        self.pos_masks = [0] * self.npieces
+        self.neg_masks = [0] * self.npieces
+        for plane, (neg_groups, pos_groups) in enumerate(self.pol_groups):
+            for grid_idx in range(len(GRID_COORDS)):
+                vec_bit = 1 << (9 * plane + grid_idx)
+                for p_id in pos_groups[grid_idx]:
+                    self.pos_masks[p_id] |= vec_bit
+                for p_id in neg_groups[grid_idx]:
+                    self.neg_masks[p_id] |= vec_bit
+
+        # when placing a piece to cover the lowest unoccupied coordinate, all lower ones are
+        # already occupied, so only pieces whose lowest block is at that coordinate qualify
+        self.buckets = [[] for _ in COORDS]
+        for p_id, mask in enumerate(self.blk_masks):
+            self.buckets[(mask & -mask).bit_length() - 1].append(p_id)
+        return self
+
+    def solve(self, all_solutions: bool = False) -> bool:
+        """Return ``True`` if solution is found; ``False`` otherwise.  If ``all_solutions``
+        is specified, the search enumerates all solutions (into ``self.solutions``).
+        """
+        start = perf_counter()
+        self.found, self.nodes = self._search(all_solutions)
+        self.wall_time = perf_counter() - start
+        if all_solutions:
+            self.solutions = self.found
+
+        self.status = FEASIBLE if self.found else INFEASIBLE
+        status_name = 'FEASIBLE' if self.found else 'INFEASIBLE'
+        print(f"Status: {self.status} ({status_name})", file=sys.stderr)
+        return bool(self.found)
+
+    def _search(self, all_solutions: bool) -> tuple[list[list[int]], int]:
+        """Run the search, and return the solutions found along with the number of nodes
+        visited.  The recursive step is a closure over local references to the masks and
+        candidate lists (avoiding attribute lookups in the inner loop).
+        """
+        blk_masks, pos_masks, neg_masks = self.blk_masks, self.pos_masks, self.neg_masks
+        candidates = [[(p_id, blk_masks[p_id], pos_masks[p_id], neg_masks[p_id])
+                       for p_id in bucket] for bucket in self.buckets]
+        found = []
+        nodes = 0
+        chosen = []
+
+        def place(free: int, pos_vecs: int, neg_vecs: int) -> bool:
+            """Place pieces to cover the free coordinates, given the polarity vectors set
+            so far (positive and negative).  Return ``True`` to stop the search.
+            """
+            nonlocal nodes
+            nodes += 1
+            if not free:
+                found.append(chosen.copy())
+                return not all_solutions
+
+            for p_id, blk_mask, p_pos, p_neg in candidates[(free & -free).bit_length() - 1]:
+                if blk_mask & ~free or p_pos & neg_vecs or p_neg & pos_vecs:
+                    continue
+                chosen.append(p_id)
+                stop = place(free & ~blk_mask, pos_vecs | p_pos, neg_vecs | p_neg)
+                chosen.pop()
+                if stop:
+                    return True
+            return False
+
+        place((1 << len(COORDS)) - 1, 0, 0)
+        return found, nodes
+
+    def solution(self, values: ValueSrcT = None) -> list[int]:
+        """Return list of pieces for the (first) solution.  Note that ``values`` is not
+        applicable for this model (there are no solver variables), so must not be
+        specified.
+        """
+        if values is not None:
+            raise ValueError("Variable values not applicable for this model")
+        return self.found[0]
+
+    def print_stats(self) -> None:
+        """Print search stats, for benchmarking and/or analysis.
+        """
+        if self.status is None:
+            raise RuntimeError("Must solve before stats are available")
+
+        print("\nSearch Stats", file=sys.stderr)
+        print(f"- Nodes     : {self.nodes}", file=sys.stderr)
+        print(f"- Wall time : {self.wall_time:.2f} secs", file=sys.stderr)
 
 ##############
 # fit_pieces #
 ##############
 
+def freeze_pieces(pieces: list) -> tuple[PieceT, ...]:
+    """Return the set of pieces as nested tuples (i.e. hashable, for use as a cache key),
+    regardless of the sequence types used by the caller.
+    """
+    return tuple(tuple((tuple(pos), tuple(pol)) for pos, pol in piece) for piece in pieces)
+
+@lru_cache(maxsize=MODEL_CACHE)
+def get_model(model_cls: Type, pieces: tuple[PieceT, ...]) -> BaseModel:
+    """Return built model of the specified class for the set of pieces (as returned by
+    ``freeze_pieces()``).  Building is deterministic and solving does not modify the
+    model, so the built instance is cached and reused across calls (NOTE: callers must
+    therefore not add constraints to it).  The cache is bounded (see ``MODEL_CACHE``),
+    since each instance holds its own model and solver.
+    """
+    return model_cls(pieces).build()
+
 def fit_pieces(pieces: list, model_cls: Type = ModelA) -> list | None:
     """Return list of pieces that fit the 3x3 cube, or ``None`` if no solution is found.
     Optional second argument designates the model class to use for solving.
@@ -340,14 +483,27 @@ def fit_pieces(pieces: list, model_cls: Type = ModelA) -> list | None:
     For now, we are stopping after the first solution, though later we may want to explore
     for the number of distinct solutions (barring rotations).
     """
-    model = model_cls(pieces)
-    model.build()
+    model = get_model(model_cls, freeze_pieces(pieces))
     succ = model.solve()
     if not succ:
         return None
     model.print_stats()
     return model.solution()
 
+def fit_pieces_all(pieces: list, model_cls: Type = ModelA) -> list[list]:
+    """Return all solutions (each as a list of pieces) that fit the 3x3 cube, enumerated
+    in a single search.  Optional second argument designates the model class to use.
+
+    Note that rotations of a solution are only reported separately to the extent that
+    they are not pruned by the model's symmetry-breaking constraints.
+    """
+    model = get_model(model_cls, tuple(pieces))
+    succ = model.solve(all_solutions=True)
+    if not succ:
+        return []
+    model.print_stats()
+    return model.solutions
+
 ########
 # main #
 ########
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Generate the puzzle pieces for the magcube puzzle (and related geometry helpers).  This
+module has no third-party dependencies, so it can be imported without pulling in the
+solver.
+"""
+
+from functools import cache
+from itertools import product, permutations
+
+# 2D types
+Coord2dT = tuple[int, int]            # (x, y) coordinates
+SquareT  = tuple[Coord2dT, Coord2dT]  # (position, polarity)
+ShapeT   = tuple[SquareT, SquareT, SquareT]
+
+# 3D types
+CoordT   = tuple[int, int, int]       # (x, y, z) coordinates
+BlockT   = tuple[CoordT, CoordT]      # (position, polarity)
+PieceT   = tuple[BlockT, BlockT, BlockT]
+RotT     = tuple[CoordT, CoordT]      # (axis permutation, axis reversals)
+
+# all valid coordinates for the puzzle (NOTE: ordered such that the list index for each
+# coordinate is the same as its packed value--see ``pack_coord()``)
+COORDS = tuple(product(range(3), repeat=3))
+
+# canonical instances of the coordinate tuples, so that all blocks share the same 27 tuple
+# objects (polarity vectors are also a subset of these)
+COORD_OBJS = {coord: coord for coord in COORDS}
+
+def pack_coord(coord: CoordT) -> int:
+    """Return packed (flat) index for 3D coordinate, in the range 0-26.
+    """
+    x, y, z = coord
+    return 9 * x + 3 * y + z
+
+################
+# build_pieces #
+################
+
+REF_SHAPES = 4
+
+# the 24 rotations of the cube, each represented as a signed axis permutation--axis ``i``
+# of the rotated space is taken from axis ``perm[i]`` of the original space, reversed if
+# ``flip[i]`` is set (NOTE: combinations with an odd total number of axis swaps and
+# reversals are reflections, and are thus excluded)
+ROTATIONS = [(perm, flip) for perm in permutations(range(3)) for flip in product((0, 1), repeat=3)
+             if (sum(perm[i] > perm[j] for i, j in ((0, 1), (0, 2), (1, 2))) + sum(flip)) % 2 == 0]
+assert len(ROTATIONS) == 24
+
+def rot_coord(coord2d: Coord2dT) -> Coord2dT:
+    """Rotate 2D coordinate (in 2x2 space) 90 degrees clockwise.  Works for either
+    position or polarity.  Cycles through (0, 0) -> (0, 1) -> (1, 1) -> (1, 0).
+    """
+    x, y = coord2d
+    return y, 1 - x
+
+def rot_shape(shape: ShapeT) -> ShapeT:
+    """Rotate shape 90 degrees clockwise, both positionally and magnetically.
+    """
+    return tuple((rot_coord(pos), rot_coord(pol)) for pos, pol in shape)
+
+def tr_shape(shape: ShapeT, vec: Coord2dT) -> ShapeT:
+    """Translate (move) shape by specified 2D vector (only affects position).
+    """
+    dx, dy = vec
+    return tuple(((x + dx, y + dy), pol) for (x, y), pol in shape)
+
+def rotate_piece(piece: PieceT, rot: RotT) -> PieceT:
+    """Rotate piece within the 3x3x3 space, both positionally and magnetically, by the
+    specified rotation (see ``ROTATIONS``).
+    """
+    perm, flip = rot
+    return tuple((tuple(2 - pos[axis] if rev else pos[axis] for axis, rev in zip(perm, flip)),
+                  tuple(pol[axis] ^ rev for axis, rev in zip(perm, flip)))
+                 for pos, pol in piece)
+
+@cache
+def build_pieces() -> tuple[PieceT, ...]:
+    """Generate full list of distinct (positionally and magnetically) puzzle pieces.  The
+    result is deterministic, so it is cached (and returned as a tuple, since it is shared
+    between callers).
+
+    Each piece is composed of three blocks, arranged in the shape of an L.  Each block is
+    described by its 3D position (within a 3x3x3 space) plus 3 dimensions of polarity
+    (assumed to be the same for all blocks within a piece--to be verified!).
+
+    For polarity, ``1`` indicates directionally positive polarity for an axis, ``0``
+    indicates directionally negative polarity.
+    """
+    xy_shapes = []  # list[ShapeT]
+    xy_pieces = []  # list[PieceT]
+    xz_pieces = []
+    yz_pieces = []
+
+    # base everything off of initial reference shape; NOTE that first square is the one in
+    # the middle (important later for setting the origin of the piece when rendering)
+    sq_0 = (0, 0), (1, 0)
+    sq_1 = (1, 0), (1, 0)
+    sq_2 = (0, 1), (1, 0)
+    sh_0 = (sq_0, sq_1, sq_2)
+    xy_shapes.append(sh_0)
+
+    # create rotations (and validate full cycling)
+    xy_shapes.append(rot_shape(xy_shapes[-1]))
+    xy_shapes.append(rot_shape(xy_shapes[-1]))
+    xy_shapes.append(rot_shape(xy_shapes[-1]))
+    assert len(xy_shapes) == REF_SHAPES
+    assert rot_shape(xy_shapes[-1]) == sh_0
+
+    # now create translations of the shapes to complete xy_shapes
+    for vec in (1, 0), (1, 1), (0, 1):
+        for shape in xy_shapes[:REF_SHAPES]:
+            xy_shapes.append(tr_shape(shape, vec))
+
+    # flipped xy_shapes--flipping along center block diagonal (so "arm" blocks swap spots),
+    # which in actuality means just reversing all of the polarities; this does not depend
+    # on z, so is only done once
+    flipped_shapes = [tuple((pos, (mx ^ 0x01, my ^ 0x01)) for pos, (mx, my) in reversed(shape))
+                      for shape in xy_shapes]
+
+    # generate xy_pieces from xy_shapes
+    for z in range(3):
+        # xy_pieces with positive z-axis polarity
+        for shape in xy_shapes:
+            xy_pieces.append(tuple(((px, py, z), (mx, my, 1))
+                                   for (px, py), (mx, my) in shape))
+
+        # add flipped xy_pieces (negative z-axis polarity)
+        for shape in flipped_shapes:
+            xy_pieces.append(tuple(((px, py, z), (mx, my, 0))
+                                   for (px, py), (mx, my) in shape))
+
+    # generate xz_pieces and yz_pieces from xy_pieces in a single pass; xz is an axis swap
+    # (y <-> z) of xy, and yz is a further swap (x <-> y) of xz, which composes into a
+    # straight axis rotation of xy (the two polarity flips cancel out)
+    for piece in xy_pieces:
+        xz_pieces.append(tuple(((px, pz, py), (mx, mz ^ 0x01, my))
+                               for (px, py, pz), (mx, my, mz) in piece))
+        yz_pieces.append(tuple(((pz, px, py), (mz, mx, my))
+                               for (px, py, pz), (mx, my, mz) in piece))
+
+    # intern position and polarity tuples (dict lookups on interned keys short-circuit on
+    # identity)
+    return tuple(tuple((COORD_OBJS[pos], COORD_OBJS[pol]) for pos, pol in piece)
+                 for piece in xy_pieces + xz_pieces + yz_pieces)
@@ -5,18 +5,16 @@
 """
 
 import sys
+from threading import Event
 
 from vpython import (canvas, vector, box, cone, compound, color, slider, wtext,
-                     event_return, rate)
+                     event_return)
 from vpython.no_notebook import stop_server
 
 def hex2rgb(val: int) -> vector:
     """Return color value as an RGB vector.
     """
-    r = val >> 16 & 0xff
-    g = val >> 8 & 0xff
-    b = val & 0xff
-    return vector(r, g, b) / 0xff
+    return vector(*val.to_bytes(3, 'big')) / 0xff
 
 # from https://www.patternfly.org/charts/colors-for-charts/
 blues   = [0x8bc1f7, 0x519de9, 0x0066cc, 0x004b95, 0x002f5d]
@@ -29,7 +27,7 @@ reds    = [0xc9190b, 0xa30000, 0x7d1007, 0x470000, 0x2c0000]
 blacks  = [0xf0f0f0, 0xd2d2d2, 0xb8bbbe, 0x8a8d90, 0x6a6e73]
 colors  = blues[:-1] + purples[:1] + cyans[:-1]
 
-palette = [hex2rgb(val) for val in colors]
+palette = tuple(hex2rgb(val) for val in colors)
 palette_sz = len(palette)
 
 BLOCK_OFFSET  = vector(1, 1, 1)
@@ -55,21 +53,23 @@ def render(solution: list[PieceT], show_polarity: bool = False) -> None:
     def explode(evt: slider) -> None:
         """Slider callback: explode pieces relative to the origin (0, 0, 0).
         """
-        nonlocal pieces, ref_pos
-        wt.text = f"{evt.value:.2f}"
-        for idx, piece in enumerate(pieces):
-            piece.pos = ref_pos[idx] * evt.value
+        nonlocal movable, cur_scale
+        if evt.value == cur_scale:
+            return
+        cur_scale = evt.value
+        wt.text = f"{cur_scale:.2f}"
+        for piece, piece_ref in movable:
+            piece.pos = piece_ref * cur_scale
 
     def key_pressed(evt: event_return) -> None:
-        """Keydown callback: change ``running`` indicator if 'q' is pressed.
+        """Keydown callback: signal ``stop_evt`` if 'q' is pressed.
         """
-        nonlocal running
         if evt.key == 'q':
-            running = False
+            stop_evt.set()
 
     pieces = []
     scene = canvas(**CANVAS_SIZE)
-    running = True
+    stop_evt = Event()
     scene.bind('keydown', key_pressed)
 
     for idx, piece in enumerate(solution):
@@ -91,9 +91,16 @@ def render(solution: list[PieceT], show_polarity: bool = False) -> None:
                         arrows.append(cone(size=ARROW_SIZE, axis=axis, pos=arrow_pos,
                                            color=arrow_col, shininess=ARROW_SHINE))
         origin = blocks[0].pos
-        pieces.append(compound(blocks + arrows, origin=origin))
+        pieces.append(compound(blocks + arrows, origin=origin, visible=False))
 
-    ref_pos = [vector(piece.pos) for piece in pieces]
+    # reveal all pieces together, once they have all been constructed
+    for piece in pieces:
+        piece.visible = True
+
+    # only pieces not centered on the origin move when exploding, so skip the others when
+    # updating positions (each update is sent to the browser)
+    movable = [(piece, vector(piece.pos)) for piece in pieces if piece.pos.mag > 0]
+    cur_scale = 1.0
 
     scene.caption = ("\nUse Ctrl+Click (or Right-Click) to rotate, Shift+Click to drag, " +
                      "Scroll to zoom in or out\n")
@@ -102,8 +109,8 @@ def render(solution: list[PieceT], show_polarity: bool = False) -> None:
     wt = wtext(text=f"{sl.value:.2f}")
     scene.append_to_caption("\n\n(Press 'q' to quit)")
 
-    while (running):
-        rate(30)
+    # block (rather than polling) until the user quits
+    stop_evt.wait()
     try:
         stop_server()  # issues a sys.exit() somewhere in its bowels (yuk!)
     except SystemExit as e:
@@ -6,7 +6,7 @@
 
 import sys
 
-from magcube import build_pieces
+from pieces import build_pieces
 
 ########
 # main #